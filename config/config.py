@@ -1,35 +1,101 @@
 """Configuration management for the Customer Support Agent"""
 
 import os
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 from dotenv import load_dotenv
 
-load_dotenv()
-
 
+@dataclass(frozen=True)
 class Config:
-    """Configuration class for application settings"""
-    
+    """Immutable application settings, parsed once from the environment"""
+
     # API Keys
-    OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
-    
+    OPENAI_API_KEY: Optional[str]
+
     # Ticket System Configuration (Jira-like)
-    TICKET_SYSTEM_URL: str = os.getenv("TICKET_SYSTEM_URL", "https://api.jira.com")
-    TICKET_SYSTEM_USERNAME: Optional[str] = os.getenv("TICKET_SYSTEM_USERNAME")
-    TICKET_SYSTEM_API_TOKEN: Optional[str] = os.getenv("TICKET_SYSTEM_API_TOKEN")
-    
+    TICKET_SYSTEM_URL: str
+    TICKET_SYSTEM_USERNAME: Optional[str]
+    TICKET_SYSTEM_API_TOKEN: Optional[str]
+
     # Knowledge Base Configuration
-    KNOWLEDGE_BASE_PATH: str = os.getenv("KNOWLEDGE_BASE_PATH", "data/knowledge_base")
-    
+    KNOWLEDGE_BASE_PATH: str
+    KNOWLEDGE_BASE_CACHE: str
+    KNOWLEDGE_BASE_INDEX_CACHE: str
+
     # Agent Configuration
-    AGENT_TEMPERATURE: float = float(os.getenv("AGENT_TEMPERATURE", "0.7"))
-    AGENT_MODEL: str = os.getenv("AGENT_MODEL", "gpt-3.5-turbo")
-    
+    AGENT_TEMPERATURE: float
+    AGENT_MODEL: str
+
     # Logging Configuration
-    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
-    LOG_FILE: str = os.getenv("LOG_FILE", "logs/customer_support_agent.log")
-    
+    LOG_LEVEL: str
+    LOG_FILE: str
+
     # Search Configuration
-    MAX_SEARCH_RESULTS: int = int(os.getenv("MAX_SEARCH_RESULTS", "5"))
-    SIMILARITY_THRESHOLD: float = float(os.getenv("SIMILARITY_THRESHOLD", "0.7"))
+    MAX_SEARCH_RESULTS: int
+    SIMILARITY_THRESHOLD: float
+
+    # Conversation History Configuration
+    MAX_HISTORY_TURNS: int
+    MAX_CONVERSATIONS: int
+    CONVERSATION_TTL_SECONDS: int
+
+    # Response Cache Configuration
+    RESPONSE_CACHE_SIZE: int
+    RESPONSE_CACHE_THRESHOLD: float
+    RESPONSE_CACHE_MAX_HISTORY: int
+
+    # Retrieval Configuration
+    PARALLEL_RETRIEVAL: bool
+
+    # Demo Configuration
+    TYPE_DELAY: Optional[float]
+    DEMO_ANIMATE: bool
+
+
+def _getenv_bool(name: str, default: bool) -> bool:
+    """Read a boolean flag such as 'true', '1' or 'no' from the environment"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """
+    Load the application configuration
+
+    The .env file is parsed and every value is cast to its target type on
+    the first call only; later calls return the same frozen instance.
+
+    Returns:
+        Shared Config instance
+    """
+    load_dotenv()
 
+    return Config(
+        OPENAI_API_KEY=os.getenv("OPENAI_API_KEY"),
+        TICKET_SYSTEM_URL=os.getenv("TICKET_SYSTEM_URL", "https://api.jira.com"),
+        TICKET_SYSTEM_USERNAME=os.getenv("TICKET_SYSTEM_USERNAME"),
+        TICKET_SYSTEM_API_TOKEN=os.getenv("TICKET_SYSTEM_API_TOKEN"),
+        KNOWLEDGE_BASE_PATH=os.getenv("KNOWLEDGE_BASE_PATH", "data/knowledge_base"),
+        KNOWLEDGE_BASE_CACHE=os.getenv("KNOWLEDGE_BASE_CACHE", "data/kb_cache.pkl"),
+        KNOWLEDGE_BASE_INDEX_CACHE=os.getenv("KNOWLEDGE_BASE_INDEX_CACHE", ".index.pkl"),
+        AGENT_TEMPERATURE=float(os.getenv("AGENT_TEMPERATURE", "0.7")),
+        AGENT_MODEL=os.getenv("AGENT_MODEL", "gpt-3.5-turbo"),
+        LOG_LEVEL=os.getenv("LOG_LEVEL", "INFO"),
+        LOG_FILE=os.getenv("LOG_FILE", "logs/customer_support_agent.log"),
+        MAX_SEARCH_RESULTS=int(os.getenv("MAX_SEARCH_RESULTS", "5")),
+        SIMILARITY_THRESHOLD=float(os.getenv("SIMILARITY_THRESHOLD", "0.7")),
+        MAX_HISTORY_TURNS=int(os.getenv("MAX_HISTORY_TURNS", "50")),
+        MAX_CONVERSATIONS=int(os.getenv("MAX_CONVERSATIONS", "1024")),
+        CONVERSATION_TTL_SECONDS=int(os.getenv("CONVERSATION_TTL_SECONDS", "86400")),
+        RESPONSE_CACHE_SIZE=int(os.getenv("RESPONSE_CACHE_SIZE", "256")),
+        RESPONSE_CACHE_THRESHOLD=float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.83")),
+        RESPONSE_CACHE_MAX_HISTORY=int(os.getenv("RESPONSE_CACHE_MAX_HISTORY", "10")),
+        PARALLEL_RETRIEVAL=_getenv_bool("PARALLEL_RETRIEVAL", True),
+        TYPE_DELAY=float(os.environ["TYPE_DELAY"]) if os.getenv("TYPE_DELAY") else None,
+        DEMO_ANIMATE=_getenv_bool("DEMO_ANIMATE", True),
+    )
@@ -3,28 +3,59 @@ Main entry point for Customer Support Agent
 Example usage and demo script
 """
 
+import hashlib
+import json
+import re
 import time
 import sys
+from typing import Optional
 
+from config.config import get_config
 from src.agent import CustomerSupportAgent
 from src.knowledge_base import KnowledgeBase
 from src.ticket_system import TicketRetriever
 from src.utils.logger import setup_logger
 
 logger = setup_logger("Main")
+CONFIG = get_config()
+
+# A word with its trailing whitespace, or a run of leading whitespace
+_TYPING_CHUNK_RE = re.compile(r"\S+\s*|\s+")
 
 
 def type_text(text: str, delay: float = 0.03) -> None:
-    """Print text with a typing effect"""
-    for char in text:
-        sys.stdout.write(char)
+    """Print text with a typing effect (per character delay, overridable via TYPE_DELAY)"""
+    if CONFIG.TYPE_DELAY is not None:
+        delay = CONFIG.TYPE_DELAY
+    
+    # No animation when disabled or when output is not a terminal
+    if delay <= 0 or not sys.stdout.isatty():
+        print(text)
+        return
+    
+    # Write and flush once per word, sleeping for the characters it contains
+    for chunk in _TYPING_CHUNK_RE.findall(text):
+        sys.stdout.write(chunk)
         sys.stdout.flush()
-        time.sleep(delay)
+        time.sleep(delay * len(chunk))
     print()  # New line after typing
 
 
+def _print_text(text: str, delay: float = 0.0) -> None:
+    """Print text immediately; drop-in for type_text when animation is off"""
+    print(text)
+
+
+def _skip_pause(seconds: float) -> None:
+    """Drop-in for time.sleep when animation is off"""
+
+
 def initialize_sample_knowledge_base(kb: KnowledgeBase) -> None:
-    """Initialize knowledge base with sample articles"""
+    """
+    Initialize knowledge base with sample articles, reusing the saved index
+    while neither the knowledge base files, the articles already in kb, nor
+    the sample articles changed
+    """
     
     articles = [
         {
@@ -69,16 +100,20 @@ def initialize_sample_knowledge_base(kb: KnowledgeBase) -> None:
         }
     ]
     
+    # The saved index replaces every article in kb, so it must have been built
+    # from the same articles, including any added before this call
+    digest = hashlib.sha1(kb.source_fingerprint().encode("utf-8"))
+    for source in (kb.get_all_articles(), articles):
+        digest.update(json.dumps(source, sort_keys=True, default=str).encode("utf-8"))
+    fingerprint = digest.hexdigest()
+    if kb.load_index(fingerprint=fingerprint):
+        return
+    
     # Add articles to knowledge base
-    for article in articles:
-        kb.add_article(
-            title=article["title"],
-            content=article["content"],
-            category=article["category"],
-            tags=article["tags"]
-        )
+    kb.add_articles(articles)
+    kb.save_index(fingerprint=fingerprint)
     
-    logger.info(f"Initialized knowledge base with {len(articles)} sample articles")
+    logger.info("Initialized knowledge base with %s sample articles", len(articles))
 
 
 def interactive_chat() -> None:
@@ -137,27 +172,37 @@ def interactive_chat() -> None:
             print("\n\nExiting...")
             break
         except Exception as e:
-            logger.error(f"Error in interactive chat: {e}")
+            logger.error("Error in interactive chat: %s", e)
             print(f"\nSorry, an error occurred: {e}\n")
 
 
-def demo_queries() -> None:
-    """Run demo queries to showcase the agent's capabilities"""
+def demo_queries(animate: Optional[bool] = None) -> None:
+    """
+    Run demo queries to showcase the agent's capabilities
+    
+    Args:
+        animate: Use the typing effect and pauses between steps.
+            Defaults to CONFIG.DEMO_ANIMATE
+    """
+    if animate is None:
+        animate = CONFIG.DEMO_ANIMATE
+    say = type_text if animate else _print_text
+    pause = time.sleep if animate else _skip_pause
     
     print("\n" + "="*60)
-    type_text("Customer Support Agent - Demo Mode", delay=0.05)
+    say("Customer Support Agent - Demo Mode", delay=0.05)
     print("="*60 + "\n")
-    time.sleep(0.5)
+    pause(0.5)
     
     # Initialize agent
-    type_text("Initializing agent...", delay=0.05)
-    time.sleep(0.8)
+    say("Initializing agent...", delay=0.05)
+    pause(0.8)
     kb = KnowledgeBase()
     initialize_sample_knowledge_base(kb)
     ticket_retriever = TicketRetriever()
     agent = CustomerSupportAgent(knowledge_base=kb, ticket_retriever=ticket_retriever)
-    type_text("Agent ready!\n", delay=0.05)
-    time.sleep(0.5)
+    say("Agent ready!\n", delay=0.05)
+    pause(0.5)
     
     # Demo queries
     demo_queries_list = [
@@ -170,31 +215,31 @@ def demo_queries() -> None:
     
     for idx, query in enumerate(demo_queries_list, 1):
         print(f"\n{'='*60}")
-        type_text(f"Demo Query {idx}: {query}", delay=0.03)
+        say(f"Demo Query {idx}: {query}", delay=0.03)
         print('='*60)
-        time.sleep(0.8)
+        pause(0.8)
         
-        type_text("\nProcessing query...", delay=0.05)
-        time.sleep(1.0)
+        say("\nProcessing query...", delay=0.05)
+        pause(1.0)
         
         response_data = agent.process_query(query)
         
-        type_text("\nResponse:", delay=0.05)
-        time.sleep(0.3)
-        type_text(response_data['response'], delay=0.02)
+        say("\nResponse:", delay=0.05)
+        pause(0.3)
+        say(response_data['response'], delay=0.02)
         
-        time.sleep(0.5)
-        type_text(f"\nSources found: {len(response_data['sources'])}", delay=0.05)
-        time.sleep(0.3)
+        pause(0.5)
+        say(f"\nSources found: {len(response_data['sources'])}", delay=0.05)
+        pause(0.3)
         for source in response_data['sources']:
             source_text = f"  - {source['type']}: {source.get('title', source.get('id', ''))}"
-            type_text(source_text, delay=0.03)
+            say(source_text, delay=0.03)
         
         print("\n" + "-"*60)
-        time.sleep(1.2)
+        pause(1.2)
     
-    time.sleep(0.5)
-    type_text("\nDemo completed!\n", delay=0.05)
+    pause(0.5)
+    say("\nDemo completed!\n", delay=0.05)
 
 
 def main():
@@ -202,7 +247,7 @@ def main():
     import sys
     
     if len(sys.argv) > 1 and sys.argv[1] == 'demo':
-        demo_queries()
+        demo_queries(animate=False if '--fast' in sys.argv[2:] else None)
     else:
         interactive_chat()
 
@@ -1,14 +1,26 @@
 """Customer Support Agent - Main AI agent for handling customer support interactions"""
 
-from typing import List, Dict, Optional, Tuple
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, FrozenSet, Optional, Tuple
 from datetime import datetime
-from config.config import Config
+from config.config import get_config
 from src.knowledge_base import KnowledgeBase
 from src.ticket_system import TicketRetriever
-from src.utils.text_processing import TextProcessor
+from src.agent.response_builder import create_contextual_response, generate_response, query_intents
+from src.utils.text_processing import TEXT_PROCESSOR
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
+CONFIG = get_config()
+
+# Response cache key: (lowercased query, query intents, query keywords)
+_CacheKey = Tuple[str, FrozenSet[str], FrozenSet[str]]
+
+# Shared by all agents; each query submits at most one ticket lookup, and
+# threads are only started on first use
+_TICKET_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ticket-fetch")
 
 
 class CustomerSupportAgent:
@@ -21,18 +33,29 @@ class CustomerSupportAgent:
     
     def __init__(self, 
                  knowledge_base: Optional[KnowledgeBase] = None,
-                 ticket_retriever: Optional[TicketRetriever] = None):
+                 ticket_retriever: Optional[TicketRetriever] = None,
+                 parallel_retrieval: Optional[bool] = None):
         """
         Initialize Customer Support Agent
         
         Args:
             knowledge_base: KnowledgeBase instance. Creates new one if not provided
             ticket_retriever: TicketRetriever instance. Creates new one if not provided
+            parallel_retrieval: Fetch tickets while searching the knowledge base.
+                Defaults to CONFIG.PARALLEL_RETRIEVAL
         """
         self.knowledge_base = knowledge_base or KnowledgeBase()
         self.ticket_retriever = ticket_retriever or TicketRetriever()
-        self.text_processor = TextProcessor()
-        self.conversation_history: List[Dict] = []
+        self.text_processor = TEXT_PROCESSOR
+        if parallel_retrieval is None:
+            parallel_retrieval = CONFIG.PARALLEL_RETRIEVAL
+        self._executor = _TICKET_EXECUTOR if parallel_retrieval else None
+        # Per-conversation bounded history, ordered from least to most recently used
+        self._history_by_conv: "OrderedDict[str, deque]" = OrderedDict()
+        # Monotonic time of each conversation's latest turn
+        self._last_active: Dict[str, float] = {}
+        # (query, intents, keywords) -> (knowledge base revision, knowledge results, response)
+        self._response_cache: "OrderedDict[_CacheKey, Tuple[int, List[Dict], str]]" = OrderedDict()
         
         logger.info("Customer Support Agent initialized")
     
@@ -47,26 +70,87 @@ class CustomerSupportAgent:
         Returns:
             Dictionary containing response and metadata
         """
-        logger.info(f"Processing query: {user_query[:100]}...")
-        
         # Extract ticket reference if present
         ticket_ref = self.text_processor.extract_ticket_reference(user_query)
+        if not ticket_ref:
+            return self._respond(user_query, conversation_id, ticket_ref, None)
+        
+        if self._executor is None:
+            ticket_details = self.ticket_retriever.get_ticket(ticket_ref)
+            return self._respond(user_query, conversation_id, ticket_ref, ticket_details)
+        
+        # Ticket lookups may go over the network, so fetch the ticket in the
+        # background while the knowledge base is searched on this thread
+        ticket_future = self._executor.submit(self.ticket_retriever.get_ticket, ticket_ref)
+        knowledge_results = self.knowledge_base.search(user_query)
+        ticket_details = ticket_future.result()
+        
+        return self._respond(
+            user_query, conversation_id, ticket_ref, ticket_details, knowledge_results
+        )
+    
+    def process_queries(self, user_queries: List[str],
+                        conversation_id: Optional[str] = None) -> List[Dict]:
+        """
+        Process several customer queries in one batch
+        
+        Referenced tickets are fetched with a single bulk lookup and the
+        knowledge base is searched for all queries at once, instead of one
+        ticket lookup and one search per query.
+        
+        Args:
+            user_queries: Customer queries, answered in order
+            conversation_id: Optional conversation ID shared by all queries
+            
+        Returns:
+            List of response dictionaries, one per query
+        """
+        ticket_refs = [
+            self.text_processor.extract_ticket_reference(query) for query in user_queries
+        ]
+        tickets = self.ticket_retriever.get_tickets_bulk([ref for ref in ticket_refs if ref])
+        knowledge_results = self.knowledge_base.search_bulk(user_queries)
+        
+        return [
+            self._respond(query, conversation_id, ticket_ref, tickets.get(ticket_ref), results)
+            for query, ticket_ref, results in zip(user_queries, ticket_refs, knowledge_results)
+        ]
+    
+    def _respond(self,
+                 user_query: str,
+                 conversation_id: Optional[str],
+                 ticket_ref: str,
+                 ticket_details: Optional[Dict],
+                 knowledge_results: Optional[List[Dict]] = None) -> Dict:
+        """
+        Build the response for a query whose ticket has already been retrieved
+        
+        Args:
+            user_query: Customer's query/question
+            conversation_id: Optional conversation ID for tracking
+            ticket_ref: Ticket reference extracted from the query, or empty string
+            ticket_details: Retrieved ticket details (if any)
+            knowledge_results: Knowledge base results, searched here if not given
+            
+        Returns:
+            Dictionary containing response and metadata
+        """
+        logger.info("Processing query: %s...", user_query[:100])
         
-        # Initialize response structure
+        # Initialize response structure (one clock read for ID and timestamp)
+        now = datetime.now()
         response_data = {
             "response": "",
             "ticket_details": None,
             "knowledge_base_results": [],
-            "conversation_id": conversation_id or f"conv-{datetime.now().timestamp()}",
-            "timestamp": datetime.now().isoformat(),
+            "conversation_id": conversation_id or f"conv-{now.timestamp()}",
+            "timestamp": now.isoformat(),
             "sources": []
         }
         
-        # Step 1: Retrieve ticket details if reference provided
-        ticket_details = None
+        # Step 1: Attach ticket details if reference provided
         if ticket_ref:
-            logger.info(f"Extracted ticket reference: {ticket_ref}")
-            ticket_details = self.ticket_retriever.get_ticket(ticket_ref)
+            logger.info("Extracted ticket reference: %s", ticket_ref)
             response_data["ticket_details"] = ticket_details
             
             if ticket_details:
@@ -76,30 +160,49 @@ class CustomerSupportAgent:
                     "title": ticket_details.get("title", "")
                 })
             else:
-                logger.warning(f"Ticket {ticket_ref} not found")
+                logger.warning("Ticket %s not found", ticket_ref)
         
-        # Step 2: Search knowledge base for relevant information
-        knowledge_results = self.knowledge_base.search(user_query)
-        response_data["knowledge_base_results"] = knowledge_results[:3]  # Top 3 results
+        # Step 2: Search knowledge base for relevant information, reusing the
+        # answer to a near-identical earlier query when one is cached
+        cache_key = None
+        cached = None
+        if not ticket_ref and self._is_cacheable(response_data["conversation_id"]):
+            cache_key = (
+                user_query.lower(),
+                query_intents(user_query),
+                self.text_processor.keyword_set(user_query),
+            )
+            cached = self._get_cached_response(cache_key)
+        
+        if cached:
+            knowledge_results, response = cached
+        elif knowledge_results is None:
+            knowledge_results = self.knowledge_base.search(user_query)
+        top_results = knowledge_results[:3]  # Top 3 results
+        response_data["knowledge_base_results"] = top_results
         
-        for kb_result in knowledge_results[:3]:
-            response_data["sources"].append({
+        sources = response_data["sources"]
+        for kb_result in top_results:
+            sources.append({
                 "type": "knowledge_base",
                 "id": kb_result.get("id", ""),
                 "title": kb_result.get("title", "")
             })
         
         # Step 3: Generate comprehensive response
-        response = self._generate_response(
-            user_query=user_query,
-            ticket_details=ticket_details,
-            knowledge_results=knowledge_results
-        )
+        if not cached:
+            response = self._generate_response(
+                user_query=user_query,
+                ticket_details=ticket_details,
+                knowledge_results=top_results
+            )
+            if cache_key:
+                self._cache_response(cache_key, top_results, response)
         
         response_data["response"] = response
         
         # Step 4: Store conversation history
-        self.conversation_history.append({
+        self._append_history({
             "timestamp": response_data["timestamp"],
             "user_query": user_query,
             "agent_response": response,
@@ -107,9 +210,99 @@ class CustomerSupportAgent:
             "conversation_id": response_data["conversation_id"]
         })
         
-        logger.info(f"Generated response for query")
+        logger.info("Generated response for query")
         return response_data
     
+    def _is_cacheable(self, conversation_id: str) -> bool:
+        """
+        Check whether a query in this conversation may use the response cache
+        
+        The first query of a session gets a greeting, and long conversations
+        are more likely to produce false cache hits, so both bypass the cache.
+        
+        Args:
+            conversation_id: Conversation ID of the query
+            
+        Returns:
+            True if the response cache may be used
+        """
+        if not self._history_by_conv:
+            return False
+        history = self._history_by_conv.get(conversation_id, ())
+        return len(history) <= CONFIG.RESPONSE_CACHE_MAX_HISTORY
+    
+    def _get_cached_response(self, cache_key: _CacheKey) -> Optional[Tuple[List[Dict], str]]:
+        """
+        Look up a cached response for a query
+        
+        An exact match of the query is tried first, then the most similar
+        cached query with the same intents (Jaccard similarity of keywords) is
+        used if it reaches CONFIG.RESPONSE_CACHE_THRESHOLD. Intents must match
+        exactly because they select the contextual part of the response. A
+        near match returns the knowledge results and relevance scores of the
+        similar query, which may differ from a fresh search.
+        
+        Args:
+            cache_key: Lowercased query, intents and keywords of the query
+            
+        Returns:
+            Tuple of (knowledge results, response) or None on a cache miss
+        """
+        _, intents, query_keywords = cache_key
+        if not query_keywords:
+            return None
+        
+        cache = self._response_cache
+        key = cache_key if cache_key in cache else None
+        
+        if key is None:
+            best_similarity = 0.0
+            query_size = len(query_keywords)
+            threshold = CONFIG.RESPONSE_CACHE_THRESHOLD
+            for cached_key in cache:
+                _, cached_intents, cached_keywords = cached_key
+                if cached_intents != intents:
+                    continue
+                # Jaccard similarity cannot exceed the ratio of the set sizes
+                cached_size = len(cached_keywords)
+                if min(query_size, cached_size) < threshold * max(query_size, cached_size):
+                    continue
+                overlap = len(query_keywords & cached_keywords)
+                similarity = overlap / (query_size + cached_size - overlap)
+                if similarity > best_similarity:
+                    best_similarity, key = similarity, cached_key
+            if key is None or best_similarity < threshold:
+                return None
+        
+        revision, knowledge_results, response = cache[key]
+        if revision != self.knowledge_base.revision:
+            del cache[key]
+            return None
+        
+        cache.move_to_end(key)
+        logger.debug("Response cache hit")
+        return list(knowledge_results), response
+    
+    def _cache_response(self, cache_key: _CacheKey,
+                        knowledge_results: List[Dict], response: str) -> None:
+        """
+        Store a generated response in the response cache
+        
+        Args:
+            cache_key: Lowercased query, intents and keywords of the query
+            knowledge_results: Knowledge base results used for the response
+            response: Generated response text
+        """
+        if not cache_key[2]:
+            return
+        
+        cache = self._response_cache
+        # Copy the results, which are also handed to the caller
+        cache[cache_key] = (self.knowledge_base.revision, list(knowledge_results), response)
+        cache.move_to_end(cache_key)
+        if len(cache) > CONFIG.RESPONSE_CACHE_SIZE:
+            cache.popitem(last=False)
+    
     def _generate_response(self, 
                           user_query: str,
                           ticket_details: Optional[Dict],
@@ -125,75 +318,11 @@ class CustomerSupportAgent:
         Returns:
             Generated response text
         """
-        response_parts = []
-        
         # Start with greeting if this is beginning of conversation
-        if len(self.conversation_history) == 0:
-            response_parts.append("Hello! I'm your customer support agent. How can I help you today?")
-            response_parts.append("")
-        
-        # Include ticket information if available
-        if ticket_details:
-            response_parts.append(f"**Ticket Information:**")
-            response_parts.append(f"📋 **Ticket ID:** {ticket_details.get('id', 'N/A')}")
-            response_parts.append(f"📌 **Title:** {ticket_details.get('title', 'N/A')}")
-            response_parts.append(f"📊 **Status:** {ticket_details.get('status', 'N/A')}")
-            response_parts.append(f"⚡ **Priority:** {ticket_details.get('priority', 'N/A')}")
-            
-            description = ticket_details.get('description', '')
-            if description:
-                response_parts.append(f"\n**Description:** {description}")
-            
-            # Include recent comments if available
-            comments = ticket_details.get('comments', [])
-            if comments:
-                response_parts.append(f"\n**Latest Updates:**")
-                for comment in comments[-2:]:  # Last 2 comments
-                    author = comment.get('author', 'N/A')
-                    body = comment.get('body', '')[:200]  # Truncate long comments
-                    response_parts.append(f"  - {author}: {body}")
-            
-            response_parts.append("")
-        
-        # Include relevant knowledge base information
-        if knowledge_results:
-            response_parts.append(f"**Relevant Information:**")
-            
-            for idx, kb_article in enumerate(knowledge_results[:3], 1):
-                title = kb_article.get('title', 'Untitled')
-                content = kb_article.get('content', '')[:300]  # Truncate long content
-                category = kb_article.get('category', 'general')
-                
-                response_parts.append(f"\n{idx}. **{title}** ({category})")
-                response_parts.append(f"   {content}")
-                
-                if len(content) >= 300:
-                    response_parts.append("   ...")
-            
-            response_parts.append("")
-        
-        # Generate contextual response based on query and retrieved information
-        contextual_response = self._create_contextual_response(
-            user_query, ticket_details, knowledge_results
+        return generate_response(
+            user_query, ticket_details, knowledge_results,
+            include_greeting=not self._history_by_conv
         )
-        
-        if contextual_response:
-            response_parts.append(f"**Based on your query:**")
-            response_parts.append(contextual_response)
-        
-        # If no relevant information found
-        if not ticket_details and not knowledge_results:
-            response_parts.append(
-                "I couldn't find specific information related to your query. "
-                "Could you please provide more details or a ticket reference? "
-                "I'm here to help you!"
-            )
-        
-        # Add closing statement
-        response_parts.append("\n---")
-        response_parts.append("Is there anything else I can help you with?")
-        
-        return "\n".join(response_parts)
     
     def _create_contextual_response(self,
                                    user_query: str,
@@ -210,40 +339,7 @@ class CustomerSupportAgent:
         Returns:
             Contextual response text
         """
-        query_lower = user_query.lower()
-        
-        # Check for common query patterns
-        if "status" in query_lower and ticket_details:
-            status = ticket_details.get('status', 'Unknown')
-            return f"Your ticket is currently **{status}**. "
-        
-        if "progress" in query_lower and ticket_details:
-            status = ticket_details.get('status', 'Unknown')
-            comments = ticket_details.get('comments', [])
-            if comments:
-                latest_comment = comments[-1].get('body', '')
-                return f"Latest update on your ticket: {latest_comment[:200]}"
-        
-        if "resolve" in query_lower or "fix" in query_lower:
-            if knowledge_results:
-                top_result = knowledge_results[0]
-                solution = top_result.get('content', '')[:200]
-                return f"Based on our knowledge base, here's a potential solution: {solution}"
-            return "I'm looking into solutions for you. Please check the relevant information above."
-        
-        if "error" in query_lower or "issue" in query_lower:
-            if ticket_details:
-                description = ticket_details.get('description', '')
-                return f"I see you're experiencing an issue. Your ticket describes: {description[:200]}"
-        
-        # Generic helpful response
-        if knowledge_results:
-            return (
-                "I've found some relevant information above that might help address your concern. "
-                "Please review the details and let me know if you need further assistance."
-            )
-        
-        return ""
+        return create_contextual_response(user_query, ticket_details, knowledge_results)
     
     def get_conversation_history(self, conversation_id: Optional[str] = None) -> List[Dict]:
         """
@@ -256,14 +352,70 @@ class CustomerSupportAgent:
             List of conversation entries
         """
         if conversation_id:
-            return [
-                entry for entry in self.conversation_history
-                if entry.get("conversation_id") == conversation_id
-            ]
-        return self.conversation_history.copy()
+            return list(self._history_by_conv.get(conversation_id, ()))
+        
+        all_entries = [
+            entry for history in self._history_by_conv.values() for entry in history
+        ]
+        all_entries.sort(key=lambda entry: entry["timestamp"])
+        return all_entries
     
     def clear_conversation_history(self) -> None:
         """Clear conversation history"""
-        self.conversation_history = []
+        self._history_by_conv.clear()
+        self._last_active.clear()
+        self._response_cache.clear()
         logger.info("Conversation history cleared")
-
+    
+    def _append_history(self, entry: Dict) -> None:
+        """
+        Append an entry to its conversation's history
+        
+        Each conversation keeps at most CONFIG.MAX_HISTORY_TURNS entries, and the
+        least recently active conversation is dropped once more than
+        CONFIG.MAX_CONVERSATIONS (at least one) are tracked.
+        
+        Args:
+            entry: Conversation history entry
+        """
+        now = time.monotonic()
+        self._evict_stale_conversations(now)
+        
+        conversation_id = entry["conversation_id"]
+        history = self._history_by_conv.get(conversation_id)
+        
+        if history is None:
+            # Make room before inserting; the current conversation is always kept
+            max_conversations = max(CONFIG.MAX_CONVERSATIONS, 1)
+            while len(self._history_by_conv) >= max_conversations:
+                evicted_id, _ = self._history_by_conv.popitem(last=False)
+                self._last_active.pop(evicted_id, None)
+            history = deque(maxlen=CONFIG.MAX_HISTORY_TURNS)
+            self._history_by_conv[conversation_id] = history
+        else:
+            self._history_by_conv.move_to_end(conversation_id)
+        
+        history.append(entry)
+        self._last_active[conversation_id] = now
+    
+    def _evict_stale_conversations(self, now: float) -> None:
+        """
+        Drop conversations idle for longer than CONFIG.CONVERSATION_TTL_SECONDS
+        
+        Conversations are kept in order of last activity, so only the idle
+        ones at the front are visited.
+        
+        Args:
+            now: Current time.monotonic() value
+        """
+        ttl = CONFIG.CONVERSATION_TTL_SECONDS
+        if ttl <= 0:
+            return
+        
+        while self._history_by_conv:
+            oldest_id = next(iter(self._history_by_conv))
+            if now - self._last_active[oldest_id] <= ttl:
+                break
+            del self._history_by_conv[oldest_id]
+            del self._last_active[oldest_id]
+            logger.debug("Evicted idle conversation %s", oldest_id)
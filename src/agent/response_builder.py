@@ -0,0 +1,202 @@
+"""Response text assembly for the Customer Support Agent
+
+Plain, fully typed functions with no agent state, so the module can be
+compiled with mypyc (``mypyc src/agent/response_builder.py``) for faster
+string and dict handling; the pure-Python module is used otherwise.
+"""
+
+import re
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+Ticket = Dict[str, Any]
+Article = Dict[str, Any]
+
+_GREETING = "Hello! I'm your customer support agent. How can I help you today?\n"
+
+_TICKET_TEMPLATE = (
+    "**Ticket Information:**\n"
+    "📋 **Ticket ID:** {id}\n"
+    "📌 **Title:** {title}\n"
+    "📊 **Status:** {status}\n"
+    "⚡ **Priority:** {priority}"
+)
+
+_TICKET_FIELDS = ("id", "title", "status", "priority")
+
+_KB_ARTICLE_TEMPLATE = "\n{idx}. **{title}** ({category})\n   {content}"
+
+_NO_RESULTS_MESSAGE = (
+    "I couldn't find specific information related to your query. "
+    "Could you please provide more details or a ticket reference? "
+    "I'm here to help you!"
+)
+
+_GENERIC_RESPONSE = (
+    "I've found some relevant information above that might help address your concern. "
+    "Please review the details and let me know if you need further assistance."
+)
+
+_CLOSING = "\n---\nIs there anything else I can help you with?"
+
+
+def _status_response(ticket_details: Optional[Ticket], knowledge_results: List[Article]) -> Optional[str]:
+    """Report the ticket status"""
+    if not ticket_details:
+        return None
+    return f"Your ticket is currently **{ticket_details.get('status', 'Unknown')}**. "
+
+
+def _progress_response(ticket_details: Optional[Ticket], knowledge_results: List[Article]) -> Optional[str]:
+    """Report the latest comment on the ticket"""
+    comments = ticket_details.get('comments', []) if ticket_details else None
+    if not comments:
+        return None
+    return f"Latest update on your ticket: {comments[-1].get('body', '')[:200]}"
+
+
+def _solution_response(ticket_details: Optional[Ticket], knowledge_results: List[Article]) -> Optional[str]:
+    """Suggest the top knowledge base article as a solution"""
+    if knowledge_results:
+        solution = knowledge_results[0].get('content', '')[:200]
+        return f"Based on our knowledge base, here's a potential solution: {solution}"
+    return "I'm looking into solutions for you. Please check the relevant information above."
+
+
+def _issue_response(ticket_details: Optional[Ticket], knowledge_results: List[Article]) -> Optional[str]:
+    """Echo the issue described in the ticket"""
+    if not ticket_details:
+        return None
+    description = ticket_details.get('description', '')
+    return f"I see you're experiencing an issue. Your ticket describes: {description[:200]}"
+
+
+# Intent keywords found anywhere in the query (substring match)
+_INTENT_RE = re.compile(r"status|progress|resolve|fix|error|issue")
+
+# Handlers in priority order; a handler returning None defers to the next intent
+_INTENT_HANDLERS: Tuple[Tuple[str, Callable[[Optional[Ticket], List[Article]], Optional[str]]], ...] = (
+    ("status", _status_response),
+    ("progress", _progress_response),
+    ("resolve", _solution_response),
+    ("fix", _solution_response),
+    ("error", _issue_response),
+    ("issue", _issue_response),
+)
+
+
+def query_intents(user_query: str) -> FrozenSet[str]:
+    """Intent keywords found in the query; they select the contextual response"""
+    return frozenset(_INTENT_RE.findall(user_query.lower()))
+
+
+def _format_ticket(ticket_details: Ticket) -> str:
+    """Format the ticket header, rendering missing fields as 'N/A'"""
+    fields = {name: ticket_details.get(name, 'N/A') for name in _TICKET_FIELDS}
+    return _TICKET_TEMPLATE.format_map(fields)
+
+
+def _format_kb_article(idx: int, kb_article: Article) -> str:
+    """Format a knowledge base article entry, truncating long content"""
+    content = kb_article.get('content', '')[:300]
+    entry = _KB_ARTICLE_TEMPLATE.format(
+        idx=idx,
+        title=kb_article.get('title', 'Untitled'),
+        category=kb_article.get('category', 'general'),
+        content=content,
+    )
+    return entry + "\n   ..." if len(content) >= 300 else entry
+
+
+def generate_response(user_query: str,
+                      ticket_details: Optional[Ticket],
+                      knowledge_results: List[Article],
+                      include_greeting: bool) -> str:
+    """
+    Generate response based on query, ticket details, and knowledge base results
+    
+    Args:
+        user_query: Original user query
+        ticket_details: Retrieved ticket details (if any)
+        knowledge_results: Relevant knowledge base articles
+        include_greeting: Start with a greeting (beginning of conversation)
+    
+    Returns:
+        Generated response text
+    """
+    response_parts: List[str] = []
+    
+    if include_greeting:
+        response_parts.append(_GREETING)
+    
+    # Include ticket information if available
+    if ticket_details:
+        response_parts.append(_format_ticket(ticket_details))
+        
+        description = ticket_details.get('description', '')
+        if description:
+            response_parts.append(f"\n**Description:** {description}")
+        
+        # Include recent comments if available (last 2, truncated)
+        comments = ticket_details.get('comments', [])
+        if comments:
+            response_parts.append("\n**Latest Updates:**")
+            response_parts.extend(
+                f"  - {comment.get('author', 'N/A')}: {comment.get('body', '')[:200]}"
+                for comment in comments[-2:]
+            )
+        
+        response_parts.append("")
+    
+    # Include relevant knowledge base information
+    if knowledge_results:
+        response_parts.append("**Relevant Information:**")
+        response_parts.extend(
+            _format_kb_article(idx, kb_article)
+            for idx, kb_article in enumerate(knowledge_results[:3], 1)
+        )
+        response_parts.append("")
+    
+    # Generate contextual response based on query and retrieved information
+    contextual_response = create_contextual_response(user_query, ticket_details, knowledge_results)
+    
+    if contextual_response:
+        response_parts.append(f"**Based on your query:**\n{contextual_response}")
+    
+    # If no relevant information found
+    if not ticket_details and not knowledge_results:
+        response_parts.append(_NO_RESULTS_MESSAGE)
+    
+    # Add closing statement
+    response_parts.append(_CLOSING)
+    
+    return "\n".join(response_parts)
+
+
+def create_contextual_response(user_query: str,
+                               ticket_details: Optional[Ticket],
+                               knowledge_results: List[Article]) -> str:
+    """
+    Create a contextual response based on the query and retrieved information
+    
+    Args:
+        user_query: User's query
+        ticket_details: Ticket details if available
+        knowledge_results: Knowledge base results
+    
+    Returns:
+        Contextual response text
+    """
+    # Find every intent keyword in a single scan, then dispatch by priority
+    intents = query_intents(user_query)
+    if intents:
+        for intent, handler in _INTENT_HANDLERS:
+            if intent in intents:
+                response = handler(ticket_details, knowledge_results)
+                if response is not None:
+                    return response
+    
+    # Generic helpful response
+    if knowledge_results:
+        return _GENERIC_RESPONSE
+    
+    return ""
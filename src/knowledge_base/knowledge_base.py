@@ -1,14 +1,42 @@
 """Knowledge Base implementation for searching customer support information"""
 
+import hashlib
+import heapq
 import json
+import math
 import os
+import pickle
+from collections import Counter
 from pathlib import Path
-from typing import List, Dict, Optional
-from config.config import Config
-from src.utils.text_processing import TextProcessor
+from typing import List, Dict, FrozenSet, NamedTuple, Optional
+from config.config import get_config
+from src.utils.text_processing import TEXT_PROCESSOR
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
+CONFIG = get_config()
+
+# BM25 term-frequency saturation and document-length normalization
+_BM25_K1 = 1.5
+_BM25_B = 0.75
+
+# Part of the cached index fingerprint; bump when tokenization or the index
+# layout changes so indexes cached by an older version are rebuilt
+_INDEX_FORMAT_VERSION = 2
+
+# Attributes holding the search index, as saved by save_index()
+_INDEX_ATTRIBUTES = ("_term_freqs", "_doc_lengths", "_total_length", "_doc_freqs", "_postings",
+                     "_search_fields")
+
+
+class _SearchFields(NamedTuple):
+    """Normalized article fields matched against the query at search time"""
+    
+    title: str
+    category: str
+    tags: str
+    tag_set: FrozenSet[str]
+    keywords: FrozenSet[str]
 
 
 class KnowledgeBase:
@@ -19,31 +47,131 @@ class KnowledgeBase:
         Initialize Knowledge Base
         
         Args:
-            base_path: Path to knowledge base directory. Defaults to Config.KNOWLEDGE_BASE_PATH
+            base_path: Path to knowledge base directory. Defaults to CONFIG.KNOWLEDGE_BASE_PATH
         """
-        self.base_path = Path(base_path or Config.KNOWLEDGE_BASE_PATH)
+        self.base_path = Path(base_path or CONFIG.KNOWLEDGE_BASE_PATH)
         self.base_path.mkdir(parents=True, exist_ok=True)
-        self.text_processor = TextProcessor()
+        self.text_processor = TEXT_PROCESSOR
         self._articles: List[Dict] = []
+        self._reset_index()
+        # Incremented whenever the article set changes
+        self.revision = 0
         self._load_articles()
-        logger.info(f"Knowledge Base initialized with {len(self._articles)} articles")
+        logger.info("Knowledge Base initialized with %s articles", len(self._articles))
     
     def _load_articles(self) -> None:
-        """Load all articles from knowledge base directory"""
+        """
+        Load all articles from knowledge base directory
+        
+        The parsed articles and their index are cached in the file named by
+        CONFIG.KNOWLEDGE_BASE_INDEX_CACHE inside the knowledge base directory,
+        and reused while the JSON files are unchanged, skipping parsing and
+        tokenization.
+        """
         self._articles = []
+        self.revision += 1
+        
+        json_files = sorted(self.base_path.glob("*.json"))
+        cache_path = (
+            self.base_path / CONFIG.KNOWLEDGE_BASE_INDEX_CACHE
+            if CONFIG.KNOWLEDGE_BASE_INDEX_CACHE else None
+        )
+        source_hash = None
+        if cache_path:
+            source_hash = self._hash_sources(json_files)
+            data = self._read_index(cache_path)
+            if data is not None and data.get("fingerprint") == source_hash:
+                self._apply_index(data)
+                logger.debug("Loaded cached index for %s", self.base_path)
+                return
         
         # Load JSON files from knowledge base directory
-        for json_file in self.base_path.glob("*.json"):
+        for json_file in json_files:
             try:
                 with open(json_file, 'r', encoding='utf-8') as f:
                     articles = json.load(f)
                     if isinstance(articles, list):
-                        self._articles.extend(articles)
+                        # Skip malformed entries rather than failing the whole file
+                        self._articles.extend(
+                            article for article in articles if isinstance(article, dict)
+                        )
                     elif isinstance(articles, dict):
                         self._articles.append(articles)
-                logger.debug(f"Loaded articles from {json_file}")
+                logger.debug("Loaded articles from %s", json_file)
             except Exception as e:
-                logger.error(f"Error loading {json_file}: {e}")
+                logger.error("Error loading %s: %s", json_file, e)
+        
+        self._reset_index()
+        for doc_id, article in enumerate(self._articles):
+            self._index_article(doc_id, article)
+        
+        if cache_path:
+            try:
+                self.save_index(str(cache_path), fingerprint=source_hash)
+            except OSError as e:
+                logger.error("Error saving knowledge base index %s: %s", cache_path, e)
+    
+    @staticmethod
+    def _hash_sources(json_files: List[Path]) -> str:
+        """Fingerprint knowledge base files by name and content"""
+        digest = hashlib.sha1(f"{_INDEX_FORMAT_VERSION}\0".encode("utf-8"))
+        for json_file in json_files:
+            digest.update(json_file.name.encode("utf-8") + b"\0")
+            try:
+                digest.update(json_file.read_bytes())
+            except OSError as e:
+                logger.error("Error reading %s: %s", json_file, e)
+            digest.update(b"\0")
+        return digest.hexdigest()
+    
+    def _reset_index(self) -> None:
+        """Clear the inverted index"""
+        # Term counts of each article's title and content, parallel to _articles
+        self._term_freqs: List[Counter] = []
+        self._doc_lengths: List[int] = []
+        self._total_length = 0
+        # Number of articles whose title or content contains each term
+        self._doc_freqs: Counter = Counter()
+        # Term -> indices of articles mentioning it in any searchable field
+        self._postings: Dict[str, List[int]] = {}
+        # Lowercased title, category and tags plus tag and keyword sets, parallel to _articles
+        self._search_fields: List[_SearchFields] = []
+    
+    def _index_article(self, doc_id: int, article: Dict) -> None:
+        """
+        Add an article to the inverted index
+        
+        Args:
+            doc_id: Position of the article in _articles
+            article: Article dictionary
+        """
+        # Fields may be null or missing in hand-written JSON files
+        title = article.get("title") or ""
+        category = article.get("category") or ""
+        tags = article.get("tags") or []
+        keywords = article.get("keywords") or []
+        
+        term_freqs = Counter(self.text_processor.tokenize(
+            f"{title} {article.get('content') or ''}"
+        ))
+        doc_length = sum(term_freqs.values())
+        self._term_freqs.append(term_freqs)
+        self._doc_lengths.append(doc_length)
+        self._total_length += doc_length
+        self._doc_freqs.update(term_freqs.keys())
+        
+        # Tags, category and curated keywords also make an article a candidate
+        extra_terms = self.text_processor.keyword_set(" ".join([category, *tags, *keywords]))
+        for term in extra_terms.union(term_freqs):
+            self._postings.setdefault(term, []).append(doc_id)
+        
+        self._search_fields.append(_SearchFields(
+            title=title.lower(),
+            category=category.lower(),
+            tags=" ".join(tag.lower() for tag in tags),
+            tag_set=frozenset(tag.lower() for tag in tags),
+            keywords=frozenset(keywords),
+        ))
     
     def add_article(self, title: str, content: str, category: str = "general", 
                    tags: List[str] = None) -> None:
@@ -56,24 +184,62 @@ class KnowledgeBase:
             category: Article category
             tags: List of tags for the article
         """
-        article = {
-            "id": f"KB-{len(self._articles) + 1}",
+        article = self._build_article(len(self._articles) + 1, title, content, category, tags)
+        self._index_article(len(self._articles), article)
+        self._articles.append(article)
+        self.revision += 1
+        logger.info("Added new article: %s", title)
+    
+    def add_articles(self, articles: List[Dict]) -> None:
+        """
+        Add several articles to the knowledge base in one batch
+        
+        Args:
+            articles: Article dictionaries with "title" and "content" and
+                optional "category" and "tags" keys
+        """
+        start = len(self._articles) + 1
+        new_articles = [
+            self._build_article(
+                start + offset,
+                article["title"],
+                article["content"],
+                article.get("category", "general"),
+                article.get("tags"),
+            )
+            for offset, article in enumerate(articles)
+        ]
+        for doc_id, article in enumerate(new_articles, len(self._articles)):
+            self._index_article(doc_id, article)
+        self._articles.extend(new_articles)
+        self.revision += 1
+        logger.info("Added %s new articles", len(new_articles))
+    
+    def _build_article(self, number: int, title: str, content: str,
+                       category: str, tags: Optional[List[str]]) -> Dict:
+        """Build an article dictionary with a generated ID and extracted keywords"""
+        return {
+            "id": f"KB-{number}",
             "title": title,
             "content": content,
             "category": category,
             "tags": tags or [],
             "keywords": self.text_processor.extract_keywords(f"{title} {content}")
         }
-        self._articles.append(article)
-        logger.info(f"Added new article: {title}")
     
-    def search(self, query: str, max_results: int = None) -> List[Dict]:
+    def search(self, query: str, max_results: int = None,
+               threshold: Optional[float] = None) -> List[Dict]:
         """
         Search the knowledge base for relevant articles
         
+        Only articles sharing at least one keyword with the query, or whose
+        title, tags or category contain it, are scored; title and content are
+        ranked with BM25.
+        
         Args:
             query: Search query
             max_results: Maximum number of results to return
+            threshold: Minimum relevance score. Defaults to CONFIG.SIMILARITY_THRESHOLD
             
         Returns:
             List of relevant articles sorted by relevance
@@ -81,58 +247,100 @@ class KnowledgeBase:
         if not query:
             return []
         
-        max_results = max_results or Config.MAX_SEARCH_RESULTS
+        max_results = max_results or CONFIG.MAX_SEARCH_RESULTS
         query_lower = query.lower()
-        query_keywords = set(self.text_processor.extract_keywords(query))
+        query_keywords = self.text_processor.keyword_set(query)
+        
+        # Blank or punctuation-only queries would match articles on stray characters
+        if not any(char.isalnum() for char in query_lower):
+            logger.info("Knowledge base search for '%s' has nothing to match", query)
+            return []
         
-        results = []
+        # Candidate articles from the inverted index
+        candidates = set()
+        for term in query_keywords:
+            candidates.update(self._postings.get(term, ()))
         
-        for article in self._articles:
+        # Plus articles whose title, tags or category contain the query, which
+        # also covers queries without keywords such as stop words or short words
+        candidates.update(
+            doc_id for doc_id, fields in enumerate(self._search_fields)
+            if query_lower in fields.title or query_lower in fields.tags or query_lower in fields.category
+        )
+        
+        # Inverse document frequency of each query term found in some article
+        num_docs = len(self._articles)
+        idf = {
+            term: math.log(1 + (num_docs - self._doc_freqs[term] + 0.5) / (self._doc_freqs[term] + 0.5))
+            for term in query_keywords if term in self._doc_freqs
+        }
+        avg_length = self._total_length / num_docs if num_docs else 0.0
+        
+        if threshold is None:
+            threshold = CONFIG.SIMILARITY_THRESHOLD
+        
+        # (score, article index) pairs; articles are only copied for the final results
+        scored = []
+        
+        for doc_id in sorted(candidates):
+            fields = self._search_fields[doc_id]
             score = 0.0
             
             # Exact title match
-            if query_lower in article.get("title", "").lower():
+            if query_lower in fields.title:
                 score += 10.0
             
-            # Content similarity
-            content_sim = self.text_processor.calculate_similarity(
-                query, f"{article.get('title', '')} {article.get('content', '')}"
-            )
-            score += content_sim * 5.0
+            # Content relevance (BM25 over title and content)
+            term_freqs = self._term_freqs[doc_id]
+            length_norm = _BM25_K1 * (
+                1 - _BM25_B + _BM25_B * self._doc_lengths[doc_id] / avg_length
+            ) if avg_length else _BM25_K1
+            for term, term_idf in idf.items():
+                tf = term_freqs.get(term)
+                if tf:
+                    score += term_idf * tf * (_BM25_K1 + 1) / (tf + length_norm)
             
             # Keyword matching
-            article_keywords = set(article.get("keywords", []))
-            if query_keywords and article_keywords:
-                keyword_overlap = len(query_keywords.intersection(article_keywords))
+            if query_keywords and fields.keywords:
+                keyword_overlap = len(query_keywords & fields.keywords)
                 keyword_score = keyword_overlap / max(len(query_keywords), 1)
                 score += keyword_score * 3.0
             
-            # Tag matching
-            article_tags = [tag.lower() for tag in article.get("tags", [])]
-            if query_lower in " ".join(article_tags):
+            # Tag matching; a query equal to one tag skips the substring scan
+            if query_lower in fields.tag_set or query_lower in fields.tags:
                 score += 2.0
             
             # Category matching
-            if query_lower in article.get("category", "").lower():
+            if query_lower in fields.category:
                 score += 1.0
             
-            if score > 0:
-                article_copy = article.copy()
-                article_copy["relevance_score"] = score
-                results.append(article_copy)
-        
-        # Sort by relevance score (descending)
-        results.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
-        
-        # Filter by threshold
-        threshold = Config.SIMILARITY_THRESHOLD
-        filtered_results = [
-            r for r in results 
-            if r.get("relevance_score", 0) >= threshold
+            # Keep articles that scored and pass the threshold
+            if score > 0 and score >= threshold:
+                scored.append((score, doc_id))
+        
+        # Top max_results by relevance score (descending), ties in article order, without sorting everything
+        top = heapq.nsmallest(max_results, scored, key=lambda item: (-item[0], item[1]))
+        
+        logger.info("Knowledge base search for '%s' returned %s results", query, len(scored))
+        return [
+            {**self._articles[doc_id], "relevance_score": score}
+            for score, doc_id in top
         ]
+    
+    def search_bulk(self, queries: List[str], max_results: int = None,
+                    threshold: Optional[float] = None) -> List[List[Dict]]:
+        """
+        Search the knowledge base for several queries at once
         
-        logger.info(f"Knowledge base search for '{query}' returned {len(filtered_results)} results")
-        return filtered_results[:max_results]
+        Args:
+            queries: Search queries
+            max_results: Maximum number of results to return per query
+            threshold: Minimum relevance score. Defaults to CONFIG.SIMILARITY_THRESHOLD
+            
+        Returns:
+            List of result lists, one per query, each sorted by relevance
+        """
+        return [self.search(query, max_results, threshold) for query in queries]
     
     def get_article_by_id(self, article_id: str) -> Optional[Dict]:
         """
@@ -168,5 +376,84 @@ class KnowledgeBase:
         filepath = self.base_path / filename
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(self._articles, f, indent=2, ensure_ascii=False)
-        logger.info(f"Saved {len(self._articles)} articles to {filepath}")
-
+        logger.info("Saved %s articles to %s", len(self._articles), filepath)
+    
+    def source_fingerprint(self) -> str:
+        """
+        Fingerprint the knowledge base JSON files and the index format
+        
+        Returns:
+            Hex digest that changes whenever a source file or the index format changes
+        """
+        return self._hash_sources(sorted(self.base_path.glob("*.json")))
+    
+    def save_index(self, path: Optional[str] = None, fingerprint: Optional[str] = None) -> None:
+        """
+        Save articles together with their search index
+        
+        Args:
+            path: Cache file path. Defaults to CONFIG.KNOWLEDGE_BASE_CACHE
+            fingerprint: Identifies the content the index was built from; see load_index
+        """
+        filepath = Path(path or CONFIG.KNOWLEDGE_BASE_CACHE)
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        data = {name: getattr(self, name) for name in _INDEX_ATTRIBUTES}
+        data["articles"] = self._articles
+        data["fingerprint"] = fingerprint
+        # Write to a temporary file first so readers never see a partial index
+        tmp_path = filepath.with_name(filepath.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, filepath)
+        logger.info("Saved knowledge base index with %s articles to %s", len(self._articles), filepath)
+    
+    def load_index(self, path: Optional[str] = None, fingerprint: Optional[str] = None) -> bool:
+        """
+        Replace the current articles with a previously saved index
+        
+        Args:
+            path: Cache file path. Defaults to CONFIG.KNOWLEDGE_BASE_CACHE
+            fingerprint: Only load an index saved with this fingerprint, so a
+                snapshot of outdated content is rejected
+            
+        Returns:
+            True if the index was loaded, False if it is missing, unreadable
+            or saved with a different fingerprint
+        """
+        filepath = Path(path or CONFIG.KNOWLEDGE_BASE_CACHE)
+        data = self._read_index(filepath)
+        if data is None:
+            return False
+        
+        if fingerprint is not None and data.get("fingerprint") != fingerprint:
+            logger.info("Knowledge base index %s is out of date", filepath)
+            return False
+        
+        self._apply_index(data)
+        logger.info("Loaded knowledge base index with %s articles from %s", len(self._articles), filepath)
+        return True
+    
+    def _read_index(self, filepath: Path) -> Optional[Dict]:
+        """Read a saved index, returning None if it is missing or unreadable"""
+        if not filepath.exists():
+            return None
+        
+        try:
+            with open(filepath, 'rb') as f:
+                data = pickle.load(f)
+        except Exception as e:
+            logger.error("Error loading knowledge base index %s: %s", filepath, e)
+            return None
+        
+        # Indexes saved by an older version lack newer attributes
+        if not isinstance(data, dict) or any(name not in data for name in ("articles", *_INDEX_ATTRIBUTES)):
+            logger.warning("Ignoring outdated knowledge base index %s", filepath)
+            return None
+        return data
+    
+    def _apply_index(self, data: Dict) -> None:
+        """Replace the current articles and index with a saved index"""
+        self._articles = data["articles"]
+        for name in _INDEX_ATTRIBUTES:
+            setattr(self, name, data[name])
+        self.revision += 1
@@ -1,16 +1,29 @@
 """Ticket Retriever for fetching ticket details from Jira-like systems"""
 
+import bisect
+import copy
+import heapq
 import json
+import math
 import os
+from collections import Counter, defaultdict
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Set, Tuple
 from datetime import datetime
 import requests
-from config.config import Config
+from requests.adapters import HTTPAdapter
+from config.config import get_config
 from src.utils.logger import setup_logger
-from src.utils.text_processing import TextProcessor
+from src.utils.text_processing import TEXT_PROCESSOR
 
 logger = setup_logger(__name__)
+CONFIG = get_config()
+
+# Score added when the query appears in a ticket's id, title and description
+_FIELD_WEIGHTS = (10.0, 5.0, 2.0)
+
+# Joins one field of all tickets into a single searchable string
+_FIELD_SEPARATOR = "\x00"
 
 
 class TicketRetriever:
@@ -27,17 +40,20 @@ class TicketRetriever:
             username: Username for authentication
             api_token: API token for authentication
         """
-        self.api_url = api_url or Config.TICKET_SYSTEM_URL
-        self.username = username or Config.TICKET_SYSTEM_USERNAME
-        self.api_token = api_token or Config.TICKET_SYSTEM_API_TOKEN
-        self.text_processor = TextProcessor()
+        self.api_url = api_url or CONFIG.TICKET_SYSTEM_URL
+        self.username = username or CONFIG.TICKET_SYSTEM_USERNAME
+        self.api_token = api_token or CONFIG.TICKET_SYSTEM_API_TOKEN
+        self.text_processor = TEXT_PROCESSOR
+        # HTTP session for the ticket API, created on first use
+        self._session: Optional[requests.Session] = None
         
         # For demo purposes, we'll use a local file-based ticket system
         # In production, this would connect to actual Jira API
         self.tickets_file = Path("data/tickets.json")
         self._initialize_local_tickets()
+        self._load_local_tickets()
         
-        logger.info(f"Ticket Retriever initialized for {self.api_url}")
+        logger.info("Ticket Retriever initialized for %s", self.api_url)
     
     def _initialize_local_tickets(self) -> None:
         """Initialize local ticket storage for demo purposes"""
@@ -102,7 +118,118 @@ class TicketRetriever:
             ]
             with open(self.tickets_file, 'w', encoding='utf-8') as f:
                 json.dump(sample_tickets, f, indent=2)
-            logger.info(f"Initialized local tickets file with {len(sample_tickets)} sample tickets")
+            logger.info("Initialized local tickets file with %s sample tickets", len(sample_tickets))
+    
+    def _tickets_file_mtime(self) -> Optional[int]:
+        """Modification time of the local tickets file, or None if it is missing"""
+        try:
+            return os.stat(self.tickets_file).st_mtime_ns
+        except OSError:
+            return None
+    
+    def _refresh_local_tickets(self) -> None:
+        """Reload the local tickets file if it changed since it was last read"""
+        if self._tickets_file_mtime() != self._tickets_mtime:
+            logger.info("Local tickets file changed, reloading %s", self.tickets_file)
+            self._load_local_tickets()
+    
+    def _load_local_tickets(self) -> None:
+        """Read the local tickets file once and index it for lookup and search"""
+        # Taken before reading so a write during the read triggers another reload
+        self._tickets_mtime = self._tickets_file_mtime()
+        self._tickets: List[Dict] = []
+        self._tickets_by_id: Dict[str, Dict] = {}
+        # Lowercased id, title and description, parallel to _tickets
+        self._ticket_fields: List[Tuple[str, str, str]] = []
+        
+        try:
+            if self.tickets_file.exists():
+                with open(self.tickets_file, 'r', encoding='utf-8') as f:
+                    tickets = json.load(f)
+                if isinstance(tickets, list):
+                    self._tickets = [ticket for ticket in tickets if isinstance(ticket, dict)]
+                else:
+                    logger.error("Local tickets file %s does not contain a list", self.tickets_file)
+        except Exception as e:
+            logger.error("Error reading local tickets: %s", e)
+        
+        for ticket in self._tickets:
+            # Fields may be null, e.g. tickets without a description
+            ticket_id = str(ticket.get("id") or "")
+            self._tickets_by_id.setdefault(ticket_id.upper(), ticket)
+            title = str(ticket.get("title") or "").lower()
+            description = str(ticket.get("description") or "").lower()
+            self._ticket_fields.append((ticket_id.lower(), title, description))
+        
+        # Each field of all tickets joined into one string, with the offset at
+        # which every ticket starts, so a query is found in a field with one scan
+        self._field_blobs: List[Tuple[str, List[int]]] = []
+        for position in range(len(_FIELD_WEIGHTS)):
+            values = [fields[position] for fields in self._ticket_fields]
+            starts = []
+            offset = 0
+            for value in values:
+                starts.append(offset)
+                offset += len(value) + len(_FIELD_SEPARATOR)
+            self._field_blobs.append((_FIELD_SEPARATOR.join(values), starts))
+        
+        # TF-IDF vectors of title and description, stored as term -> [(ticket index, weight)]
+        term_counts = [
+            Counter(self.text_processor.tokenize(f"{title} {description}"))
+            for _, title, description in self._ticket_fields
+        ]
+        doc_freqs = Counter(term for counts in term_counts for term in counts)
+        num_tickets = len(self._tickets)
+        self._idf: Dict[str, float] = {
+            term: math.log((1 + num_tickets) / (1 + doc_freq)) + 1
+            for term, doc_freq in doc_freqs.items()
+        }
+        self._tfidf_postings: Dict[str, List[Tuple[int, float]]] = {}
+        for idx, counts in enumerate(term_counts):
+            for term, weight in self._tfidf_vector(counts).items():
+                self._tfidf_postings.setdefault(term, []).append((idx, weight))
+        
+        logger.debug("Loaded %s local tickets", len(self._tickets))
+    
+    def _tfidf_vector(self, term_counts: Counter) -> Dict[str, float]:
+        """L2-normalized TF-IDF weights of the terms known to the ticket index"""
+        weights = {
+            term: count * self._idf[term]
+            for term, count in term_counts.items() if term in self._idf
+        }
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        if not norm:
+            return {}
+        return {term: weight / norm for term, weight in weights.items()}
+    
+    def _field_matches(self, position: int, query_lower: str) -> List[int]:
+        """
+        Find the tickets whose field contains the query
+        
+        Args:
+            position: Field index into _ticket_fields (0 id, 1 title, 2 description)
+            query_lower: Lowercased query
+            
+        Returns:
+            Indices of matching tickets in ascending order
+        """
+        if not query_lower or _FIELD_SEPARATOR in query_lower:
+            return [
+                idx for idx, fields in enumerate(self._ticket_fields)
+                if query_lower in fields[position]
+            ]
+        
+        blob, starts = self._field_blobs[position]
+        matches = []
+        pos = blob.find(query_lower)
+        while pos >= 0:
+            idx = bisect.bisect_right(starts, pos) - 1
+            matches.append(idx)
+            if idx + 1 == len(starts):
+                break
+            # Resume at the next ticket; one match per ticket is enough
+            pos = blob.find(query_lower, starts[idx + 1])
+        return matches
     
     def get_ticket(self, ticket_id: str) -> Optional[Dict]:
         """
@@ -121,31 +248,73 @@ class TicketRetriever:
         ticket = self._get_ticket_from_local(ticket_id)
         
         if ticket:
-            logger.info(f"Retrieved ticket {ticket_id} from local storage")
+            logger.info("Retrieved ticket %s from local storage", ticket_id)
             return ticket
         
         # In production, fetch from actual API
         ticket = self._fetch_ticket_from_api(ticket_id)
         
         if ticket:
-            logger.info(f"Retrieved ticket {ticket_id} from API")
+            logger.info("Retrieved ticket %s from API", ticket_id)
             return ticket
         
-        logger.warning(f"Ticket {ticket_id} not found")
+        logger.warning("Ticket %s not found", ticket_id)
         return None
     
+    def get_tickets_bulk(self, ticket_ids: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Retrieve details for several tickets at once
+        
+        Tickets found in local storage are returned directly; only tickets
+        missing locally are fetched from the API.
+        
+        Args:
+            ticket_ids: Ticket IDs (e.g., ["PROJ-1001", "PROJ-1002"])
+            
+        Returns:
+            Dictionary mapping each requested ticket ID to its ticket or None
+        """
+        clean_ids = {
+            ticket_id: self.text_processor.clean_text(ticket_id).upper()
+            for ticket_id in ticket_ids
+        }
+        local_tickets = self._get_tickets_from_local(set(clean_ids.values()))
+        
+        tickets = {}
+        for ticket_id, clean_id in clean_ids.items():
+            ticket = local_tickets.get(clean_id) or self._fetch_ticket_from_api(clean_id)
+            if not ticket:
+                logger.warning("Ticket %s not found", clean_id)
+            tickets[ticket_id] = ticket
+        
+        logger.info("Retrieved %s of %s tickets in bulk", sum(1 for t in tickets.values() if t), len(tickets))
+        return tickets
+    
     def _get_ticket_from_local(self, ticket_id: str) -> Optional[Dict]:
-        """Get ticket from local JSON file"""
-        try:
-            if self.tickets_file.exists():
-                with open(self.tickets_file, 'r', encoding='utf-8') as f:
-                    tickets = json.load(f)
-                    for ticket in tickets:
-                        if ticket.get("id", "").upper() == ticket_id:
-                            return ticket
-        except Exception as e:
-            logger.error(f"Error reading local tickets: {e}")
-        return None
+        """Get a copy of a ticket from local storage, so callers may modify it"""
+        self._refresh_local_tickets()
+        ticket = self._tickets_by_id.get(ticket_id)
+        return copy.deepcopy(ticket) if ticket is not None else None
+    
+    def _get_tickets_from_local(self, ticket_ids: Set[str]) -> Dict[str, Dict]:
+        """Get copies of several tickets from local storage"""
+        self._refresh_local_tickets()
+        return {
+            ticket_id: copy.deepcopy(self._tickets_by_id[ticket_id])
+            for ticket_id in ticket_ids if ticket_id in self._tickets_by_id
+        }
+    
+    def _get_session(self) -> requests.Session:
+        """Get the authenticated API session, reusing pooled keep-alive connections"""
+        if self._session is None:
+            session = requests.Session()
+            session.auth = (self.username, self.api_token)
+            session.headers.update({"Accept": "application/json"})
+            adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._session = session
+        return self._session
     
     def _fetch_ticket_from_api(self, ticket_id: str) -> Optional[Dict]:
         """
@@ -166,23 +335,18 @@ class TicketRetriever:
             url = f"{self.api_url}/rest/api/2/issue/{ticket_id}"
             
             # Make authenticated request
-            response = requests.get(
-                url,
-                auth=(self.username, self.api_token),
-                headers={"Accept": "application/json"},
-                timeout=10
-            )
+            response = self._get_session().get(url, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
                 # Transform Jira API response to our format
                 return self._transform_jira_response(data)
             else:
-                logger.error(f"API request failed with status {response.status_code}")
+                logger.error("API request failed with status %s", response.status_code)
                 return None
                 
         except requests.exceptions.RequestException as e:
-            logger.error(f"Error fetching ticket from API: {e}")
+            logger.error("Error fetching ticket from API: %s", e)
             return None
     
     def _transform_jira_response(self, jira_data: Dict) -> Dict:
@@ -220,6 +384,9 @@ class TicketRetriever:
         """
         Search tickets by query
         
+        ID, title and description substring matches are combined with the
+        TF-IDF cosine similarity between the query and each ticket's text.
+        
         Args:
             query: Search query
             max_results: Maximum number of results
@@ -228,48 +395,41 @@ class TicketRetriever:
             List of matching tickets
         """
         query_lower = query.lower()
-        matching_tickets = []
         
-        try:
-            if self.tickets_file.exists():
-                with open(self.tickets_file, 'r', encoding='utf-8') as f:
-                    tickets = json.load(f)
-                    
-                    for ticket in tickets:
-                        score = 0.0
-                        title = ticket.get("title", "").lower()
-                        description = ticket.get("description", "").lower()
-                        ticket_id = ticket.get("id", "").lower()
-                        
-                        # Check if query matches ticket ID
-                        if query_lower in ticket_id:
-                            score += 10.0
-                        
-                        # Check title match
-                        if query_lower in title:
-                            score += 5.0
-                        
-                        # Check description match
-                        if query_lower in description:
-                            score += 2.0
-                        
-                        # Calculate similarity
-                        text_content = f"{title} {description}"
-                        similarity = self.text_processor.calculate_similarity(query, text_content)
-                        score += similarity * 3.0
-                        
-                        if score > 0:
-                            ticket_copy = ticket.copy()
-                            ticket_copy["match_score"] = score
-                            matching_tickets.append(ticket_copy)
-                    
-                    # Sort by score
-                    matching_tickets.sort(key=lambda x: x.get("match_score", 0), reverse=True)
-                    logger.info(f"Ticket search for '{query}' returned {len(matching_tickets)} results")
-                    return matching_tickets[:max_results]
+        # Blank or punctuation-only queries would match tickets on stray characters
+        if not any(char.isalnum() for char in query_lower):
+            return []
         
-        except Exception as e:
-            logger.error(f"Error searching tickets: {e}")
+        self._refresh_local_tickets()
+        
+        # Substring matches on id, title and description
+        field_scores: Dict[int, float] = defaultdict(float)
+        for position, weight in enumerate(_FIELD_WEIGHTS):
+            for idx in self._field_matches(position, query_lower):
+                field_scores[idx] += weight
+        
+        # Cosine similarity between the query and every ticket sharing a term with it
+        similarities: Dict[int, float] = defaultdict(float)
+        query_terms = self.text_processor.tokenize(query)
+        if query_terms:
+            query_vector = self._tfidf_vector(Counter(query_terms))
+            for term, query_weight in query_vector.items():
+                for idx, weight in self._tfidf_postings[term]:
+                    similarities[idx] += query_weight * weight
+        
+        # Only tickets matched by either signal can score above zero; tickets
+        # are only copied for the final results
+        scored = []
+        for idx in field_scores.keys() | similarities.keys():
+            score = field_scores.get(idx, 0.0) + similarities.get(idx, 0.0) * 3.0
+            if score > 0:
+                scored.append((score, idx))
         
-        return []
+        # Top max_results by score (descending), ties in ticket order, without sorting everything
+        top = heapq.nsmallest(max_results, scored, key=lambda item: (-item[0], item[1]))
+        logger.info("Ticket search for '%s' returned %s results", query, len(scored))
+        return [
+            {**self._tickets[idx], "match_score": score}
+            for score, idx in top
+        ]
 
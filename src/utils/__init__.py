@@ -1,7 +1,7 @@
 """Utility Functions Module"""
 
-from .text_processing import TextProcessor
+from .text_processing import TextProcessor, TEXT_PROCESSOR
 from .logger import setup_logger
 
-__all__ = ['TextProcessor', 'setup_logger']
+__all__ = ['TextProcessor', 'TEXT_PROCESSOR', 'setup_logger']
 
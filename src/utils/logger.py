@@ -3,7 +3,44 @@
 import logging
 import os
 from pathlib import Path
-from config.config import Config
+from typing import Dict, List
+from config.config import get_config
+
+CONFIG = get_config()
+
+# Loggers already configured by setup_logger, by name
+_LOGGERS: Dict[str, logging.Logger] = {}
+
+# File and console handlers shared by all loggers, so the log file is opened once
+_HANDLERS: List[logging.Handler] = []
+
+
+def _get_handlers() -> List[logging.Handler]:
+    """Create the shared handlers on first use"""
+    if not _HANDLERS:
+        # Create logs directory if it doesn't exist
+        log_file_path = Path(CONFIG.LOG_FILE)
+        log_file_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # File handler
+        file_handler = logging.FileHandler(CONFIG.LOG_FILE)
+        file_handler.setLevel(logging.DEBUG)
+        
+        # Console handler
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.INFO)
+        
+        # Formatter
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+        
+        file_handler.setFormatter(formatter)
+        console_handler.setFormatter(formatter)
+        
+        _HANDLERS.extend((file_handler, console_handler))
+    return _HANDLERS
 
 
 def setup_logger(name: str = "CustomerSupportAgent") -> logging.Logger:
@@ -16,37 +53,16 @@ def setup_logger(name: str = "CustomerSupportAgent") -> logging.Logger:
     Returns:
         Configured logger instance
     """
-    logger = logging.getLogger(name)
-    
-    # Avoid adding handlers multiple times
-    if logger.handlers:
-        return logger
-    
-    logger.setLevel(getattr(logging, Config.LOG_LEVEL, logging.INFO))
-    
-    # Create logs directory if it doesn't exist
-    log_file_path = Path(Config.LOG_FILE)
-    log_file_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    # File handler
-    file_handler = logging.FileHandler(Config.LOG_FILE)
-    file_handler.setLevel(logging.DEBUG)
+    if name in _LOGGERS:
+        return _LOGGERS[name]
     
-    # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    
-    # Formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
+    logger = logging.getLogger(name)
     
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Avoid adding handlers to a logger configured elsewhere
+    if not logger.handlers:
+        logger.setLevel(getattr(logging, CONFIG.LOG_LEVEL, logging.INFO))
+        for handler in _get_handlers():
+            logger.addHandler(handler)
     
+    _LOGGERS[name] = logger
     return logger
-
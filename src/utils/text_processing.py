@@ -1,9 +1,64 @@
 """Text processing utilities"""
 
 import re
-from typing import List, Dict
+from functools import lru_cache
+from typing import List, Dict, FrozenSet, Tuple
 from collections import Counter
 
+# Common ticket formats: PROJ-123, #PROJ-123, TICKET-456, #789, etc. Key-style
+# references take precedence over "#789" anywhere in the text: the anchored
+# first branch scans the whole text for a key before "#number" is tried.
+_TICKET_RE = re.compile(r'^.*?(?P<key>[A-Z]+-\d+)|#(?P<number>\d+)', re.IGNORECASE | re.DOTALL)
+
+_WS_RE = re.compile(r'\s+')
+_WORD_RE = re.compile(r'\b\w+\b')
+
+# Common words ignored by tokenization
+_STOP_WORDS = frozenset({
+    'the', 'is', 'at', 'which', 'on', 'a', 'an', 'as', 'are',
+    'was', 'were', 'been', 'be', 'have', 'has', 'had', 'do',
+    'does', 'did', 'will', 'would', 'should', 'could', 'may',
+    'might', 'must', 'can', 'this', 'that', 'these', 'those',
+})
+
+# Entries kept by each memoized text helper; queries repeat often across turns
+_CACHE_SIZE = 4096
+
+
+def _tokenize(text: str, min_length: int) -> List[str]:
+    """Lowercased words of text without stop words, in order and with repeats"""
+    # Remove special characters and split
+    words = _WORD_RE.findall(text.lower())
+    # Filter by length and common stop words
+    return [w for w in words if len(w) >= min_length and w not in _STOP_WORDS]
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _keyword_set(text: str, min_length: int) -> FrozenSet[str]:
+    """Cached distinct keywords of text, without frequency ordering"""
+    return frozenset(_tokenize(text, min_length))
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _extract_keywords(text: str, min_length: int) -> Tuple[str, ...]:
+    """Cached keyword extraction; see TextProcessor.extract_keywords"""
+    # Return unique keywords sorted by frequency
+    keyword_counts = Counter(_tokenize(text, min_length))
+    return tuple(word for word, count in keyword_counts.most_common())
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _calculate_similarity(text1: str, text2: str) -> float:
+    """Cached Jaccard similarity; see TextProcessor.calculate_similarity"""
+    words1 = _keyword_set(text1, 3)
+    words2 = _keyword_set(text2, 3)
+    
+    if not words1 or not words2:
+        return 0.0
+    
+    overlap = len(words1 & words2)
+    return overlap / (len(words1) + len(words2) - overlap)
+
 
 class TextProcessor:
     """Utility class for text processing operations"""
@@ -19,20 +74,10 @@ class TextProcessor:
         Returns:
             Extracted ticket reference or empty string
         """
-        # Patterns for common ticket formats: PROJ-123, TICKET-456, #789, etc.
-        patterns = [
-            r'[A-Z]+-\d+',  # JIRA style: PROJ-123
-            r'#[A-Z]+-\d+',  # With hash: #PROJ-123
-            r'TICKET-\d+',  # TICKET-456
-            r'#\d+',  # Simple number: #789
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                # Remove hash if present
-                ticket_ref = match.group(0).replace('#', '')
-                return ticket_ref.upper()
+        match = _TICKET_RE.search(text)
+        if match:
+            # Either group, without the hash
+            return (match.group("key") or match.group("number")).upper()
         
         return ""
     
@@ -51,17 +96,37 @@ class TextProcessor:
             return ""
         
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = _WS_RE.sub(' ', text)
         # Remove leading/trailing whitespace
         text = text.strip()
         
         return text
     
+    @staticmethod
+    def tokenize(text: str, min_length: int = 3) -> List[str]:
+        """
+        Split text into lowercased tokens, dropping stop words and short words
+        
+        Unlike extract_keywords, repeated words are kept so term frequencies
+        can be counted.
+        
+        Args:
+            text: Input text
+            min_length: Minimum token length
+            
+        Returns:
+            List of tokens in text order
+        """
+        return _tokenize(text, min_length)
+    
     @staticmethod
     def extract_keywords(text: str, min_length: int = 3) -> List[str]:
         """
         Extract keywords from text
         
+        Results are cached per (text, min_length), so repeated queries are
+        only tokenized once.
+        
         Args:
             text: Input text
             min_length: Minimum keyword length
@@ -69,24 +134,33 @@ class TextProcessor:
         Returns:
             List of keywords
         """
-        # Remove special characters and split
-        words = re.findall(r'\b\w+\b', text.lower())
-        # Filter by length and common stop words
-        stop_words = {'the', 'is', 'at', 'which', 'on', 'a', 'an', 'as', 'are', 
-                     'was', 'were', 'been', 'be', 'have', 'has', 'had', 'do', 
-                     'does', 'did', 'will', 'would', 'should', 'could', 'may', 
-                     'might', 'must', 'can', 'this', 'that', 'these', 'those'}
-        
-        keywords = [w for w in words if len(w) >= min_length and w not in stop_words]
-        # Return unique keywords sorted by frequency
-        keyword_counts = Counter(keywords)
-        return [word for word, count in keyword_counts.most_common()]
+        return list(_extract_keywords(text, min_length))
+    
+    @staticmethod
+    def keyword_set(text: str, min_length: int = 3) -> FrozenSet[str]:
+        """
+        Extract the distinct keywords of text as a set
+        
+        Cheaper than extract_keywords when the frequency order is not needed,
+        e.g. for overlap and similarity checks. Results are cached like
+        extract_keywords.
+        
+        Args:
+            text: Input text
+            min_length: Minimum keyword length
+            
+        Returns:
+            Frozen set of keywords
+        """
+        return _keyword_set(text, min_length)
     
     @staticmethod
     def calculate_similarity(text1: str, text2: str) -> float:
         """
         Calculate simple word-based similarity between two texts
         
+        Results are cached per (text1, text2) pair.
+        
         Args:
             text1: First text
             text2: Second text
@@ -94,19 +168,7 @@ class TextProcessor:
         Returns:
             Similarity score between 0 and 1
         """
-        words1 = set(TextProcessor.extract_keywords(text1))
-        words2 = set(TextProcessor.extract_keywords(text2))
-        
-        if not words1 or not words2:
-            return 0.0
-        
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-        
-        if not union:
-            return 0.0
-        
-        return len(intersection) / len(union)
+        return _calculate_similarity(text1, text2)
     
     @staticmethod
     def format_response(response: str, max_length: int = 500) -> str:
@@ -127,3 +189,6 @@ class TextProcessor:
         
         return response
 
+
+# Shared instance; TextProcessor holds no state, so one is enough for all components
+TEXT_PROCESSOR = TextProcessor()
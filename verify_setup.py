@@ -7,7 +7,8 @@ def verify_imports():
     print("Verifying imports...")
     
     try:
-        from config.config import Config
+        from config.config import get_config
+        get_config()
         print("✓ Config imported successfully")
     except Exception as e:
         print(f"✗ Config import failed: {e}")
@@ -45,50 +46,76 @@ def verify_imports():
     return True
 
 
+def _check_logger():
+    """Initialize a logger"""
+    from src.utils.logger import setup_logger
+    setup_logger("Test")
+    return "✓ Logger initialized successfully"
+
+
+def _check_text_processor():
+    """Extract a ticket reference with TextProcessor"""
+    from src.utils.text_processing import TextProcessor
+    processor = TextProcessor()
+    ticket_ref = processor.extract_ticket_reference("Check ticket PROJ-123")
+    if ticket_ref != "PROJ-123":
+        raise ValueError(f"got {ticket_ref}")
+    return "✓ TextProcessor works correctly"
+
+
+def _init_knowledge_base():
+    """Initialize the knowledge base"""
+    from src.knowledge_base import KnowledgeBase
+    return KnowledgeBase()
+
+
+def _init_ticket_retriever():
+    """Initialize the ticket retriever"""
+    from src.ticket_system import TicketRetriever
+    return TicketRetriever()
+
+
 def verify_initialization():
     """Verify that key components can be initialized"""
     print("\nVerifying initialization...")
     
-    try:
-        from src.utils.logger import setup_logger
-        logger = setup_logger("Test")
-        print("✓ Logger initialized successfully")
-    except Exception as e:
-        print(f"✗ Logger initialization failed: {e}")
-        return False
+    from concurrent.futures import ThreadPoolExecutor, as_completed
     
-    try:
-        from src.utils.text_processing import TextProcessor
-        processor = TextProcessor()
-        ticket_ref = processor.extract_ticket_reference("Check ticket PROJ-123")
-        if ticket_ref == "PROJ-123":
-            print("✓ TextProcessor works correctly")
-        else:
-            print(f"✗ TextProcessor test failed (got {ticket_ref})")
-            return False
-    except Exception as e:
-        print(f"✗ TextProcessor test failed: {e}")
-        return False
-    
-    try:
-        from src.knowledge_base import KnowledgeBase
-        kb = KnowledgeBase()
-        print("✓ KnowledgeBase initialized successfully")
-    except Exception as e:
-        print(f"✗ KnowledgeBase initialization failed: {e}")
-        return False
-    
-    try:
-        from src.ticket_system import TicketRetriever
-        tr = TicketRetriever()
-        print("✓ TicketRetriever initialized successfully")
-    except Exception as e:
-        print(f"✗ TicketRetriever initialization failed: {e}")
+    # Independent components are initialized concurrently; results are
+    # reported as they finish
+    all_good = True
+    components = {}
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = {
+            executor.submit(_check_logger): ("Logger initialization", None),
+            executor.submit(_check_text_processor): ("TextProcessor test", None),
+            executor.submit(_init_knowledge_base): ("KnowledgeBase initialization", "KnowledgeBase"),
+            executor.submit(_init_ticket_retriever): ("TicketRetriever initialization", "TicketRetriever"),
+        }
+        for future in as_completed(futures):
+            check, component = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"✗ {check} failed: {e}")
+                all_good = False
+                continue
+            if component:
+                components[component] = result
+                print(f"✓ {component} initialized successfully")
+            else:
+                print(result)
+    
+    if not all_good:
         return False
     
+    # The agent reuses the components initialized above
     try:
         from src.agent import CustomerSupportAgent
-        agent = CustomerSupportAgent()
+        agent = CustomerSupportAgent(
+            knowledge_base=components["KnowledgeBase"],
+            ticket_retriever=components["TicketRetriever"],
+        )
         print("✓ CustomerSupportAgent initialized successfully")
     except Exception as e:
         print(f"✗ CustomerSupportAgent initialization failed: {e}")
@@ -102,7 +129,6 @@ def verify_file_structure():
     print("\nVerifying file structure...")
     
     import os
-    from pathlib import Path
     
     required_dirs = [
         "src",
@@ -127,17 +153,30 @@ def verify_file_structure():
         "src/utils/text_processing.py"
     ]
     
+    # List each parent directory once instead of checking every path separately
+    entries = {}
+    
+    def exists(path):
+        parent, name = os.path.split(path)
+        if parent not in entries:
+            try:
+                with os.scandir(parent or ".") as it:
+                    entries[parent] = {entry.name for entry in it}
+            except OSError:
+                entries[parent] = set()
+        return name in entries[parent]
+    
     all_good = True
     
     for dir_path in required_dirs:
-        if Path(dir_path).exists():
+        if exists(dir_path):
             print(f"✓ Directory exists: {dir_path}")
         else:
             print(f"✗ Directory missing: {dir_path}")
             all_good = False
     
     for file_path in required_files:
-        if Path(file_path).exists():
+        if exists(file_path):
             print(f"✓ File exists: {file_path}")
         else:
             print(f"✗ File missing: {file_path}")